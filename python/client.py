@@ -6,11 +6,18 @@ import os
 import datetime
 import numpy as np
 import uuid
+import sys
+import json
+import struct
 
 URL_PYTHON_SERVER = "http://localhost:5000/interpretedServer/reconstruct"
 URL_JAVA_SERVER = "http://localhost:8080/compiledServer/reconstruct"
+URL_PYTHON_BULK = "http://localhost:5000/interpretedServer/reconstructBatch"
+BULK_BATCH_SIZE = 50
 
 file_lock = threading.Lock()
+SIGNAL_CACHE = {}
+signal_cache_lock = threading.Lock()
 
 def read_sorteio_file(filename='sorteio_requisicoes.txt'): 
     requests_list = []
@@ -39,6 +46,66 @@ def read_sorteio_file(filename='sorteio_requisicoes.txt'):
         
     return requests_list
 
+def read_trace_file(filename):
+    trace = []
+    try:
+        with open(filename, 'r') as f:
+            for line in f:
+                if line.startswith('#'): continue
+                parts = line.strip().split(',')
+                if len(parts) == 5:
+                    timestamp, model, signal, algorithm, has_gain_str = parts
+
+                    trace.append((float(timestamp), {
+                        'model': model,
+                        'signal': signal,
+                        'algorithm': algorithm,
+                        'has_gain': has_gain_str.lower() == 'true',
+                        'S': 794 if model == 'H_60x60.csv' else 436
+                    }))
+        trace.sort(key=lambda entry: entry[0])
+        print(f"[INFO] {len(trace)} requisições lidas do trace: {filename}")
+    except FileNotFoundError:
+        print(f"[ERRO] Trace não encontrado: {filename}. Execute 'sorteio.py carga' primeiro.")
+    except Exception as e:
+        print(f"[ERRO] Erro ao ler o trace {filename}: {e}")
+
+    return trace
+
+def save_result(image_bytes, image_name, meta, req_duration, model, signal, gain, server_tag, report_img_path, report_perf_path, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    image_path = os.path.join(output_dir, image_name)
+
+    with open(image_path, 'wb') as f:
+        f.write(image_bytes)
+
+    iteracoes = meta.get('X-Iteracoes', '0')
+    exec_time = meta.get('X-Tempo', '0')
+    alg = meta.get('X-Algoritmo', 'unknown')
+    start = meta.get('X-Inicio', '')
+    finish = meta.get('X-Fim', '')
+    size = meta.get('X-Tamanho', '')
+    uso_cpu = meta.get('X-Cpu', '')
+    uso_mem = meta.get('X-Mem', '')
+
+    with file_lock:
+        with open(report_img_path, 'a') as f:
+            f.write(
+                f"{image_name} - Arquivo: {alg}, "
+                f"Inicio: {start}, Fim: {finish}, Tamanho: {size}, "
+                f"Iterações: {iteracoes}, Tempo Servidor: {exec_time} s, "
+                f"Tempo Req Total: {req_duration:.4f} s, Modelo: {model}, "
+                f"Sinal: {signal}, Ganho: {gain}\n"
+            )
+
+    with file_lock:
+        with open(report_perf_path, 'a') as f:
+            f.write(
+                f"[{finish}] Servidor: {server_tag.upper()}, CPU: {uso_cpu}%, Memória: {uso_mem}%\n"
+            )
+
+    print(f"[SUCESSO] {server_tag.upper()} - {image_name} salva em {req_duration:.2f}s")
+
 def make_request(target_url, server_tag, sinal_bin, tamanho, model, signal, algorithm, gain,report_img_path, report_perf_path, output_dir):
     try:
         headers = {
@@ -57,38 +124,8 @@ def make_request(target_url, server_tag, sinal_bin, tamanho, model, signal, algo
 
         if resp.status_code == 200:
             image_name = f"img_{algorithm}_{signal.replace('.csv', '')}_{server_tag}.png"
-            os.makedirs(output_dir, exist_ok=True)
-            image_path = os.path.join(output_dir, image_name)
-
-            with open(image_path, 'wb') as f:
-                f.write(resp.content)
-
-            iteracoes = resp.headers.get('X-Iteracoes', '0')
-            exec_time = resp.headers.get('X-Tempo', '0')
-            alg = resp.headers.get('X-Algoritmo', 'unknown')
-            start = resp.headers.get('X-Inicio', '')
-            finish = resp.headers.get('X-Fim', '')
-            size = resp.headers.get('X-Tamanho', '')
-            uso_cpu = resp.headers.get('X-Cpu', '')
-            uso_mem = resp.headers.get('X-Mem', '')
-
-            with file_lock:
-                with open(report_img_path, 'a') as f:
-                    f.write(
-                        f"{image_name} - Arquivo: {alg}, "
-                        f"Inicio: {start}, Fim: {finish}, Tamanho: {size}, "
-                        f"Iterações: {iteracoes}, Tempo Servidor: {exec_time} s, "
-                        f"Tempo Req Total: {req_duration:.4f} s, Modelo: {model}, "
-                        f"Sinal: {signal}, Ganho: {gain}\n"
-                    )
-
-            with file_lock:
-                with open(report_perf_path, 'a') as f:
-                    f.write(
-                        f"[{finish}] Servidor: {server_tag.upper()}, CPU: {uso_cpu}%, Memória: {uso_mem}%\n"
-                    )
-
-            print(f"[SUCESSO] {server_tag.upper()} - {image_name} salva em {req_duration:.2f}s")
+            save_result(resp.content, image_name, resp.headers, req_duration, model, signal, gain,
+                        server_tag, report_img_path, report_perf_path, output_dir)
 
         else:
             print(f"[ERRO] {server_tag.upper()} - Resposta: {resp.status_code} - {resp.text}")
@@ -109,22 +146,24 @@ def get_server_choice():
             return choice
         print("Opção inválida. Por favor, digite 1 ou 2")
 
-def send_signal(index, params, report_img_path, report_perf_path, output_dir, server_choice):
-    model = params['model']
+def prepare_signal(params):
     filename = params['signal']
-    algorithm = params['algorithm']
     S = params['S']
-    has_gain = params['has_gain']
 
     try:
-        raw_signal = np.loadtxt(filename, delimiter=",").flatten()
+        # O mesmo sinal se repete muitas vezes numa carga; lê cada CSV uma única vez,
+        # mesmo com várias threads de lote chamando prepare_signal ao mesmo tempo.
+        with signal_cache_lock:
+            if filename not in SIGNAL_CACHE:
+                SIGNAL_CACHE[filename] = np.loadtxt(filename, delimiter=",").flatten()
+            raw_signal = SIGNAL_CACHE[filename]
     except Exception as e:
         print(f"[ERRO] Não foi possível ler {filename}: {e}")
-        return []
+        return None
     
     N_SENSORS = 64
 
-    if has_gain:
+    if params['has_gain']:
         y_indices = np.arange(S, dtype=np.float64)
         gamma_sensor = 100.0 + 0.05 * y_indices * np.sqrt(y_indices)
         gamma_full = np.tile(gamma_sensor, N_SENSORS)
@@ -134,8 +173,91 @@ def send_signal(index, params, report_img_path, report_perf_path, output_dir, se
         signal_gain = raw_signal 
         gain_str = "Nulo"
 
-    sinal_bin = signal_gain.astype(np.float32).tobytes()
-    tamanho = len(signal_gain)
+    return signal_gain.astype(np.float32).tobytes(), len(signal_gain), gain_str
+
+def get_mode_choice():
+    print("\n==============================================")
+    print("Modo de envio para o Servidor Python:")
+    print("1 - Individual (uma requisição por sinal)")
+    print("2 - Lote (várias reconstruções por requisição)")
+    print("==============================================")
+
+    while True:
+        choice = input("Digite 1 ou 2: ").strip()
+        if choice in ['1', '2']:
+            return choice
+        print("Opção inválida. Por favor, digite 1 ou 2")
+
+def send_bulk(batch, report_img_path, report_perf_path, output_dir):
+    manifest = []
+    payloads = []
+    items_by_id = {}
+
+    for item_id, params in batch:
+        prepared = prepare_signal(params)
+        if prepared is None:
+            continue
+        sinal_bin, tamanho, gain_str = prepared
+        manifest.append({'id': item_id, 'modelo': params['model'], 'alg': params['algorithm'],
+                         'ganho': gain_str, 'tamanho': tamanho})
+        payloads.append(sinal_bin)
+        items_by_id[item_id] = (params, gain_str)
+
+    if not manifest:
+        return
+
+    manifest_bin = json.dumps(manifest).encode('utf-8')
+    body = struct.pack('>I', len(manifest_bin)) + manifest_bin + b''.join(payloads)
+
+    print(f"[LOTE] Enviando {len(manifest)} sinais em uma requisição...")
+
+    try:
+        start_req_time = time.time()
+        resp = requests.post(URL_PYTHON_BULK, data=body, headers={"Content-Type": "application/octet-stream"}, stream=True)
+        if resp.status_code != 200:
+            print(f"[ERRO] PYTHON LOTE - Resposta: {resp.status_code} - {resp.text}")
+            return
+
+        stream = resp.raw
+        stream.decode_content = True
+        for _ in range(len(manifest)):
+            line = stream.readline()
+            if not line:
+                print("[ERRO] PYTHON LOTE - Conexão encerrada antes de todos os resultados.")
+                break
+            meta = json.loads(line)
+            png = stream.read(meta['bytes']) if meta['bytes'] else b''
+            req_duration = time.time() - start_req_time
+
+            params, gain_str = items_by_id[meta['id']]
+            if meta['status'] != 200:
+                print(f"[ERRO] PYTHON LOTE - Item {meta['id']}: {meta['status']} - {meta.get('error')}")
+                continue
+
+            image_name = f"img_{meta['id']}_{params['algorithm']}_{params['signal'].replace('.csv', '')}_python.png"
+            headers = {
+                'X-Iteracoes': str(meta['iteracoes']),
+                'X-Tempo': str(meta['tempo']),
+                'X-Algoritmo': meta['algoritmo'],
+                'X-Cpu': str(meta['cpu']),
+                'X-Mem': str(meta['mem']),
+            }
+            save_result(png, image_name, headers, req_duration, params['model'], params['signal'], gain_str,
+                        "python", report_img_path, report_perf_path, output_dir)
+
+    except requests.exceptions.RequestException as e:
+        print(f"[ERRO] PYTHON LOTE - Falha na comunicação: {e}")
+
+def send_signal(index, params, report_img_path, report_perf_path, output_dir, server_choice):
+    model = params['model']
+    filename = params['signal']
+    algorithm = params['algorithm']
+    S = params['S']
+
+    prepared = prepare_signal(params)
+    if prepared is None:
+        return []
+    sinal_bin, tamanho, gain_str = prepared
 
     print(f"[DISPARO {index}] Enviando {filename} (S={S}, N=64)...")
 
@@ -162,17 +284,7 @@ def send_signal(index, params, report_img_path, report_perf_path, output_dir, se
 
     return threads_criadas
 
-def executar_cliente(sorteio_filename='sorteio_requisicoes.txt'):
-    
-    server_choice = get_server_choice()
-
-    requests_to_execute = read_sorteio_file(sorteio_filename)
-    if not requests_to_execute:
-        print("[ERRO] Nenhuma requisição para executar. Saindo.")
-        return
-
-    num_sinais = len(requests_to_execute)
-
+def init_reports(num_sinais):
     client_id = str(uuid.uuid4())[:8]
     report_img_path = f'relatorio_imagens_{client_id}.txt'
     report_perf_path = f'relatorio_desempenho_{client_id}.txt'
@@ -191,12 +303,38 @@ def executar_cliente(sorteio_filename='sorteio_requisicoes.txt'):
         f.write("=== DESEMPENHO ===\n")
         f.write(f"Inicio Teste: {datetime.datetime.now()}\n\n")
 
+    return client_id, report_img_path, report_perf_path, output_dir
+
+def executar_cliente(sorteio_filename='sorteio_requisicoes.txt'):
+    
+    server_choice = get_server_choice()
+    mode_choice = get_mode_choice() if server_choice == '1' else '1'
+
+    requests_to_execute = read_sorteio_file(sorteio_filename)
+    if not requests_to_execute:
+        print("[ERRO] Nenhuma requisição para executar. Saindo.")
+        return
+
+    num_sinais = len(requests_to_execute)
+
+    client_id, report_img_path, report_perf_path, output_dir = init_reports(num_sinais)
+
     all_threads = []
     start_time = time.time()
 
-    for i, params in enumerate(requests_to_execute):
-        novas_threads = send_signal(i+1, params, report_img_path, report_perf_path, output_dir, server_choice)
-        all_threads.extend(novas_threads)
+    if mode_choice == '2':
+        indexed = list(enumerate(requests_to_execute, start=1))
+        for b in range(0, len(indexed), BULK_BATCH_SIZE):
+            thread_lote = threading.Thread(
+                target=send_bulk,
+                args=(indexed[b:b + BULK_BATCH_SIZE], report_img_path, report_perf_path, output_dir)
+            )
+            thread_lote.start()
+            all_threads.append(thread_lote)
+    else:
+        for i, params in enumerate(requests_to_execute):
+            novas_threads = send_signal(i+1, params, report_img_path, report_perf_path, output_dir, server_choice)
+            all_threads.extend(novas_threads)
 
     print(f"\n=== TODOS OS SINAIS FORAM DISPARADOS ===")
     print(f"=== AGUARDANDO RETORNO... ===\n")
@@ -207,5 +345,46 @@ def executar_cliente(sorteio_filename='sorteio_requisicoes.txt'):
     total_time = time.time() - start_time
     print(f"=== TESTE DE CARGA {client_id} FINALIZADO EM {total_time:.2f} SEGUNDOS ===")
 
+def executar_replay(trace_filename, speed=1.0):
+    server_choice = get_server_choice()
+
+    trace = read_trace_file(trace_filename)
+    if not trace:
+        print("[ERRO] Nenhuma requisição para executar. Saindo.")
+        return
+
+    client_id, report_img_path, report_perf_path, output_dir = init_reports(len(trace))
+    print(f"=== REPLAY DE {trace_filename} EM VELOCIDADE {speed}x (0 = sem espera) ===")
+
+    all_threads = []
+    max_lag = 0.0
+    start_time = time.time()
+
+    for i, (timestamp, params) in enumerate(trace):
+        if speed > 0:
+            target = start_time + timestamp / speed
+            delay = target - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            max_lag = max(max_lag, time.time() - target)
+
+        novas_threads = send_signal(i+1, params, report_img_path, report_perf_path, output_dir, server_choice)
+        all_threads.extend(novas_threads)
+
+    print(f"\n=== TODOS OS SINAIS FORAM DISPARADOS (atraso máximo de disparo: {max_lag:.3f}s) ===")
+    print(f"=== AGUARDANDO RETORNO... ===\n")
+
+    for t in all_threads:
+        t.join()
+
+    total_time = time.time() - start_time
+    print(f"=== REPLAY {client_id} FINALIZADO EM {total_time:.2f} SEGUNDOS ===")
+
 if __name__ == "__main__":
-    executar_cliente()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == 'replay':
+        # python client.py replay <trace> [velocidade]
+        trace_file = sys.argv[2] if len(sys.argv) > 2 else 'carga_trace.txt'
+        speed = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+        executar_replay(trace_file, speed)
+    else:
+        executar_cliente()
\ No newline at end of file
@@ -0,0 +1,79 @@
+import os
+os.environ["OMP_NUM_THREADS"] = "1"
+os.environ["OPENBLAS_NUM_THREADS"] = "1"
+os.environ["MKL_NUM_THREADS"] = "1"
+
+import sys
+import time
+import datetime
+import numpy as np
+from solvers import SOLVERS, RELATIVE_TOLERANCE
+
+CACHE_DIR = "model_cache"
+MAX_ITERATIONS_BENCH = 200
+# Resíduo alvo relativo: ||g - H f|| <= TARGET_RELATIVE_RESIDUAL * ||g||
+TARGET_RELATIVE_RESIDUAL = RELATIVE_TOLERANCE
+
+TEST_MAP = [
+    ('H_60x60.csv', 'sinal_1_60x60.csv'),
+    ('H_60x60.csv', 'sinal_2_60x60.csv'),
+    ('H_60x60.csv', 'sinal_3_60x60.csv'),
+    ('H_30x30.csv', 'sinal_1_30x30.csv'),
+    ('H_30x30.csv', 'sinal_2_30x30.csv'),
+    ('H_30x30.csv', 'sinal_3_30x30.csv'),
+]
+
+def normalize(x):
+    x_mean = np.mean(x)
+    x_std = np.std(x)
+    return (x - x_mean) / x_std if x_std > 1e-12 else x - x_mean
+
+def load_model(model_name):
+    base_name = os.path.splitext(model_name)[0]
+    npy_path = os.path.join(CACHE_DIR, f"{base_name}.npy")
+    if os.path.exists(npy_path):
+        H = np.load(npy_path)
+    else:
+        H = np.loadtxt(model_name, delimiter=',', dtype=np.float32)
+    return normalize(H.astype(np.float32))
+
+def comparar_solvers(target=TARGET_RELATIVE_RESIDUAL, max_iter=MAX_ITERATIONS_BENCH):
+    print("=========================================================")
+    print("       COMPARAÇÃO DE ALGORITMOS DE RECONSTRUÇÃO        ")
+    print(f"Data: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Resíduo alvo: {target} * ||g||  |  Máx. iterações: {max_iter}")
+    print("---------------------------------------------------------")
+    print("{:<12} {:<18} {:<12} {:<8} {:<12} {:<10}".format(
+        "MODELO", "SINAL", "ALGORITMO", "ITER", "RESÍDUO REL", "TEMPO (s)"))
+    print("---------------------------------------------------------")
+
+    H_cache = {}
+    for model_name, signal_file in TEST_MAP:
+        try:
+            if model_name not in H_cache:
+                H_cache.clear()
+                H_cache[model_name] = load_model(model_name)
+            H_norm = H_cache[model_name]
+            g_norm = normalize(np.loadtxt(signal_file, delimiter=',').flatten()).astype(np.float32)
+        except Exception as e:
+            print(f"[ERRO] Falha ao carregar {model_name}/{signal_file}: {e}")
+            continue
+
+        g_size = float(np.linalg.norm(g_norm))
+        tol = target * g_size
+
+        for alg_name, solver in sorted(SOLVERS.items()):
+            start = time.time()
+            f, its, history = solver(H_norm, g_norm, max_iter=max_iter, tol=tol)
+            elapsed = time.time() - start
+
+            rel = history[-1] / g_size if g_size > 0 else 0.0
+            status = "" if history[-1] < tol else "  (alvo não atingido)"
+            print("{:<12} {:<18} {:<12} {:<8} {:<12.4f} {:<10.3f}{}".format(
+                model_name.replace('.csv', ''), signal_file, alg_name.upper(), its, rel, elapsed, status))
+
+    print("=========================================================")
+
+if __name__ == '__main__':
+    target = float(sys.argv[1]) if len(sys.argv) > 1 else TARGET_RELATIVE_RESIDUAL
+    comparar_solvers(target)
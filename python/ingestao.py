@@ -0,0 +1,179 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import datetime
+import numpy as np
+from multiprocessing import Pool
+
+CACHE_DIR = "model_cache"
+MODEL_FILES = ['H_60x60.csv', 'H_30x30.csv']
+CHUNK_BYTES = 32 * 1024 * 1024
+HASH_BLOCK_BYTES = 8 * 1024 * 1024
+
+def cache_paths(csv_file, cache_dir=CACHE_DIR):
+    base_name = os.path.splitext(os.path.basename(csv_file))[0]
+    return os.path.join(cache_dir, f"{base_name}.npy"), os.path.join(cache_dir, f"{base_name}.json")
+
+def find_chunks(csv_path, chunk_bytes=CHUNK_BYTES):
+    # Divide o arquivo em faixas de bytes que começam e terminam em fim de linha.
+    size = os.path.getsize(csv_path)
+    chunks = []
+    start = 0
+    with open(csv_path, 'rb') as f:
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()
+            end = min(f.tell(), size)
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+def _read_range(csv_path, start, end):
+    with open(csv_path, 'rb') as f:
+        f.seek(start)
+        return f.read(end - start)
+
+def _count_rows(args):
+    csv_path, start, end = args
+    data = _read_range(csv_path, start, end)
+    return sum(1 for line in data.splitlines() if line.strip())
+
+def _parse_chunk(args):
+    csv_path, start, end, row_offset, n_rows, n_cols, npy_path = args
+    # Mesma regra de _count_rows: linhas em branco são ignoradas (aceita CRLF e último \n ausente).
+    data = b','.join(line for line in _read_range(csv_path, start, end).splitlines() if line.strip())
+    values = np.fromstring(data, dtype=np.float32, sep=',')
+    if values.size != n_rows * n_cols:
+        raise ValueError(f"{csv_path}: bytes {start}-{end} tem {values.size} valores, esperado {n_rows * n_cols}")
+
+    out = np.load(npy_path, mmap_mode='r+')
+    out[row_offset:row_offset + n_rows] = values.reshape(n_rows, n_cols)
+    out.flush()
+    del out
+
+    # Estatísticas parciais (n, média, M2) para combinar depois sem reler o arquivo.
+    mean = float(np.mean(values, dtype=np.float64))
+    m2 = float(np.sum((values.astype(np.float64) - mean) ** 2))
+    return values.size, mean, m2
+
+def _combine_stats(parts):
+    n, mean, m2 = 0, 0.0, 0.0
+    for n_b, mean_b, m2_b in parts:
+        if n_b == 0: continue
+        delta = mean_b - mean
+        total = n + n_b
+        mean += delta * n_b / total
+        m2 += m2_b + delta * delta * n * n_b / total
+        n = total
+    return mean, (m2 / n) ** 0.5 if n else 0.0
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_manifest(manifest_path):
+    try:
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def is_cache_fresh(csv_file, cache_dir=CACHE_DIR, verify_checksum=False):
+    npy_path, manifest_path = cache_paths(csv_file, cache_dir)
+    manifest = read_manifest(manifest_path)
+    if not isinstance(manifest, dict) or not os.path.exists(npy_path):
+        return False
+
+    # Manifesto incompleto (ex.: versão antiga ou escrita interrompida) conta como desatualizado.
+    H = np.load(npy_path, mmap_mode='r')
+    if list(H.shape) != manifest.get('shape') or str(H.dtype) != manifest.get('dtype'):
+        return False
+    if manifest.get('mean') is None or manifest.get('std') is None:
+        return False
+
+    # Sem o CSV (ex.: implantação só com o cache) o manifesto é a referência.
+    if os.path.exists(csv_file):
+        st = os.stat(csv_file)
+        if st.st_size != manifest.get('source_size') or st.st_mtime != manifest.get('source_mtime'):
+            return False
+
+    if verify_checksum and file_sha256(npy_path) != manifest.get('sha256'):
+        return False
+    return True
+
+def ingest_model(csv_file, cache_dir=CACHE_DIR, workers=None, chunk_bytes=CHUNK_BYTES):
+    os.makedirs(cache_dir, exist_ok=True)
+    npy_path, manifest_path = cache_paths(csv_file, cache_dir)
+    tmp_path = npy_path + '.tmp'
+    start_time = time.time()
+
+    st = os.stat(csv_file)
+    with open(csv_file, 'rb') as f:
+        first_line = next((line for line in f if line.strip()), b'')
+        n_cols = len(first_line.strip().split(b','))
+
+    chunks = find_chunks(csv_file, chunk_bytes)
+    with Pool(workers) as pool:
+        rows = pool.map(_count_rows, [(csv_file, s, e) for s, e in chunks])
+        n_rows = sum(rows)
+
+        # Escreve float32 direto no arquivo final, sem passar por um array float64 em memória.
+        out = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=(n_rows, n_cols))
+        del out
+
+        tasks = []
+        row_offset = 0
+        for (s, e), r in zip(chunks, rows):
+            tasks.append((csv_file, s, e, row_offset, r, n_cols, tmp_path))
+            row_offset += r
+        parts = pool.map(_parse_chunk, tasks)
+
+    mean, std = _combine_stats(parts)
+    os.replace(tmp_path, npy_path)
+
+    manifest = {
+        'source': os.path.basename(csv_file),
+        'source_size': st.st_size,
+        'source_mtime': st.st_mtime,
+        'shape': [n_rows, n_cols],
+        'dtype': 'float32',
+        'sha256': file_sha256(npy_path),
+        'mean': mean,
+        'std': std,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f" -> {csv_file}: {n_rows}x{n_cols} float32 em {time.time() - start_time:.2f}s ({len(chunks)} blocos)")
+    return manifest
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Converte modelos CSV em cache binário float32 (.npy) com manifesto.")
+    parser.add_argument('arquivos', nargs='*', default=MODEL_FILES)
+    parser.add_argument('--saida', default=CACHE_DIR)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--bloco-mb', type=int, default=CHUNK_BYTES // (1024 * 1024))
+    parser.add_argument('--forcar', action='store_true', help="Reprocessa mesmo com cache atualizado")
+    parser.add_argument('--verificar', action='store_true', help="Confere o checksum do cache existente")
+    args = parser.parse_args(argv)
+
+    print("=== INGESTÃO DE MODELOS ===")
+    for csv_file in args.arquivos:
+        if not args.forcar and is_cache_fresh(csv_file, args.saida, verify_checksum=args.verificar):
+            print(f" -> {csv_file}: cache atualizado, nada a fazer.")
+            continue
+        if not os.path.exists(csv_file):
+            print(f"[ERRO] {csv_file} não encontrado e sem cache válido.")
+            continue
+        ingest_model(csv_file, args.saida, args.workers, args.bloco_mb * 1024 * 1024)
+    print("=== INGESTÃO CONCLUÍDA ===")
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
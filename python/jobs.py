@@ -0,0 +1,198 @@
+import os
+import json
+import math
+import time
+import uuid
+import queue
+import sqlite3
+import threading
+
+JOB_QUEUE_SIZE = 5000
+JOB_WORKERS = 2
+JOB_RESULT_TTL = 600
+JOB_MAX_WAIT = 60
+JOB_JANITOR_INTERVAL = 30
+# Defina JOB_DB_PATH para que os jobs sobrevivam a reinícios do servidor (SQLite).
+JOB_DB_PATH = os.environ.get('JOB_DB_PATH')
+
+FINAL_STATES = ('done', 'failed', 'cancelled')
+
+JOBS = {}
+jobs_cond = threading.Condition()
+job_queue = queue.Queue()
+pending_jobs = 0
+
+_db = None
+_db_lock = threading.Lock()
+_process_fn = None
+
+def _db_execute(sql, args=()):
+    if _db is None: return
+    with _db_lock:
+        try:
+            _db.execute(sql, args)
+            _db.commit()
+        except sqlite3.Error:
+            _db.rollback()
+            raise
+
+def _db_log_errors(fn, *args):
+    # Falhas do SQLite (banco travado, disco cheio) não podem derrubar workers nem o janitor.
+    try:
+        fn(*args)
+    except sqlite3.Error as e:
+        print(f"[ERRO] SQLite de jobs: {e}")
+
+def _db_save(job, signal=None):
+    # Com SQLite o sinal de um job pendente fica só no banco; salvar sem 'signal' o descarta.
+    _db_execute(
+        "INSERT OR REPLACE INTO jobs (id, status, params, signal, result, meta, error, created, finished) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (job['id'], job['status'], json.dumps(job['params']), signal, job['result'],
+         json.dumps(job['meta']), job['error'], job['created'], job['finished']))
+
+def _db_load_signal(job_id):
+    with _db_lock:
+        row = _db.execute("SELECT signal FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None or row[0] is None:
+        raise RuntimeError("Sinal do job não encontrado no banco")
+    return row[0]
+
+def _open_db(db_path):
+    global _db, pending_jobs
+
+    _db = sqlite3.connect(db_path, check_same_thread=False)
+    _db.execute(
+        "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, status TEXT, params TEXT, signal BLOB, "
+        "result BLOB, meta TEXT, error TEXT, created REAL, finished REAL)")
+    _db.commit()
+
+    # Jobs que estavam na fila (ou em execução quando o processo caiu) voltam para a fila, respeitando
+    # JOB_QUEUE_SIZE: os mais antigos são reenfileirados e o excedente é marcado como falho.
+    rows = _db.execute(
+        "SELECT id, status, params, result, meta, error, created, finished FROM jobs ORDER BY created").fetchall()
+    requeued = dropped = 0
+    for job_id, status, params, result, meta, error, created, finished in rows:
+        overflow = False
+        if status in ('queued', 'running'):
+            if requeued < JOB_QUEUE_SIZE:
+                status = 'queued'
+                requeued += 1
+            else:
+                status, error, finished = 'failed', 'Fila de jobs cheia ao restaurar', time.time()
+                overflow = True
+                dropped += 1
+        job = {
+            'id': job_id, 'status': status, 'params': json.loads(params), 'signal': None,
+            'result': result, 'meta': json.loads(meta) if meta else {}, 'error': error,
+            'created': created, 'finished': finished,
+        }
+        JOBS[job_id] = job
+        if status == 'queued':
+            pending_jobs += 1
+            job_queue.put(job_id)
+        elif overflow:
+            _db.execute("UPDATE jobs SET status = ?, signal = NULL, error = ?, finished = ? WHERE id = ?",
+                        (status, error, finished, job_id))
+    _db.commit()
+
+    print(f" -> Jobs restaurados de {db_path}: {len(rows)} ({requeued} reenfileirados, {dropped} descartados por fila cheia)")
+
+def _worker():
+    global pending_jobs
+
+    while True:
+        job_id = job_queue.get()
+        with jobs_cond:
+            job = JOBS.get(job_id)
+            if job is None or job['status'] != 'queued':
+                continue
+            job['status'] = 'running'
+            pending_jobs -= 1
+        _db_log_errors(_db_execute, "UPDATE jobs SET status = 'running' WHERE id = ?", (job_id,))
+
+        try:
+            signal = job['signal'] if job['signal'] is not None else _db_load_signal(job_id)
+            result, meta = _process_fn(job['params'], signal)
+            status, error = 'done', None
+        except Exception as e:
+            print(f"Erro job {job_id}: {e}")
+            result, meta, status, error = None, {}, 'failed', str(e)
+
+        with jobs_cond:
+            job.update(status=status, result=result, meta=meta, error=error, signal=None, finished=time.time())
+            jobs_cond.notify_all()
+        _db_log_errors(_db_save, job)
+
+def _janitor():
+    while True:
+        time.sleep(JOB_JANITOR_INTERVAL)
+        limit = time.time() - JOB_RESULT_TTL
+        with jobs_cond:
+            expired = [job_id for job_id, job in JOBS.items()
+                       if job['status'] in FINAL_STATES and job['finished'] and job['finished'] < limit]
+            for job_id in expired:
+                del JOBS[job_id]
+        _db_log_errors(_db_execute, "DELETE FROM jobs WHERE finished IS NOT NULL AND finished < ?", (limit,))
+
+def init_jobs(process_fn, db_path=JOB_DB_PATH, workers=JOB_WORKERS):
+    global _process_fn
+    _process_fn = process_fn
+
+    if db_path:
+        _open_db(db_path)
+
+    for _ in range(workers):
+        threading.Thread(target=_worker, daemon=True).start()
+    threading.Thread(target=_janitor, daemon=True).start()
+
+def submit_job(params, signal_bytes):
+    global pending_jobs
+
+    with jobs_cond:
+        if pending_jobs >= JOB_QUEUE_SIZE:
+            return None
+        job = {
+            'id': uuid.uuid4().hex, 'status': 'queued', 'params': params,
+            'signal': None if _db is not None else signal_bytes,
+            'result': None, 'meta': {}, 'error': None, 'created': time.time(), 'finished': None,
+        }
+        JOBS[job['id']] = job
+        pending_jobs += 1
+
+    try:
+        _db_save(job, signal_bytes)
+    except sqlite3.Error:
+        with jobs_cond:
+            JOBS.pop(job['id'], None)
+            pending_jobs -= 1
+        raise
+
+    job_queue.put(job['id'])
+    return job
+
+def get_job(job_id, wait=0):
+    if not math.isfinite(wait): wait = 0
+    deadline = time.time() + min(max(wait, 0), JOB_MAX_WAIT)
+    with jobs_cond:
+        job = JOBS.get(job_id)
+        while job is not None and job['status'] not in FINAL_STATES:
+            remaining = deadline - time.time()
+            if remaining <= 0: break
+            jobs_cond.wait(remaining)
+            job = JOBS.get(job_id)
+        return job
+
+def cancel_job(job_id):
+    global pending_jobs
+
+    with jobs_cond:
+        job = JOBS.get(job_id)
+        if job is None or job['status'] != 'queued':
+            return job
+        job.update(status='cancelled', signal=None, finished=time.time())
+        pending_jobs -= 1
+        jobs_cond.notify_all()
+
+    _db_log_errors(_db_save, job)
+    return job
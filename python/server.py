@@ -7,11 +7,19 @@ import time
 import numpy as np
 import psutil
 import io
+import json
+import math
+import queue
+import sqlite3
+import struct
 import threading
 import datetime
-from flask import Flask, request, jsonify, send_file, make_response
+from flask import Flask, Response, request, jsonify, send_file, make_response
 from PIL import Image
 from typing import Tuple, List
+from solvers import SOLVERS, get_solver, solve_relative, solver_options
+from jobs import init_jobs, submit_job, get_job, cancel_job
+from ingestao import cache_paths, ingest_model, is_cache_fresh, read_manifest
 
 app = Flask(__name__)
 
@@ -36,10 +44,9 @@ semaphore_files = [threading.Semaphore(1) for _ in range(NUM_FILES_TESTED)]
 semaphore7 = threading.Semaphore(1) 
 
 RAW_MODEL_CACHE = {} 
+MODEL_STATS = {}
 MODEL_FILES = ['H_60x60.csv', 'H_30x30.csv']
 CACHE_DIR = "model_cache"
-MAX_ITERATIONS = 10
-ERROR_TOLERANCE = 1e-4
 
 def load_raw_models_ram():
     if not os.path.exists(CACHE_DIR):
@@ -48,19 +55,19 @@ def load_raw_models_ram():
     print("=== CARREGANDO MODELOS BRUTOS PARA RAM ===")
     
     for csv_file in MODEL_FILES:
-        base_name = os.path.splitext(csv_file)[0]
-        npy_path = os.path.join(CACHE_DIR, f"{base_name}.npy")
+        npy_path, manifest_path = cache_paths(csv_file, CACHE_DIR)
         
         try:
-            if os.path.exists(npy_path):
+            if is_cache_fresh(csv_file, CACHE_DIR):
                 print(f" -> Lendo binário: {npy_path}")
-                H = np.load(npy_path)
+                manifest = read_manifest(manifest_path)
             else:
-                print(f" -> Convertendo CSV para Binário (1ª vez): {csv_file}")
-                H = np.loadtxt(csv_file, delimiter=',', dtype=np.float64)
-                np.save(npy_path, H)
+                print(f" -> Cache ausente ou desatualizado, convertendo CSV: {csv_file}")
+                manifest = ingest_model(csv_file, CACHE_DIR)
+            H = np.load(npy_path)
 
-            RAW_MODEL_CACHE[csv_file] = H.astype(np.float32)
+            RAW_MODEL_CACHE[csv_file] = H
+            MODEL_STATS[csv_file] = (manifest['mean'], manifest['std'])
             
             print(f" -> {csv_file} carregado na RAM (Bruto).")
             
@@ -69,60 +76,6 @@ def load_raw_models_ram():
 
     print("=== CARREGAMENTO CONCLUÍDO ===")
 
-def execute_cgne(H, g_norm):
-    H_T = H.T 
-    
-    f = np.zeros(H.shape[1], dtype=np.float32)
-    r = g_norm.astype(np.float32)
-    p = H_T @ r
-    r_norm_old = np.linalg.norm(r)
-
-    for i in range(MAX_ITERATIONS):
-        p_norm_sq = np.dot(p, p)
-        if p_norm_sq < 1e-15: break
-        
-        alpha = (r_norm_old**2) / p_norm_sq 
-        f = f + alpha * p
-        r = r - alpha * (H @ p)
-        r_norm_new = np.linalg.norm(r)
-
-        if r_norm_new < ERROR_TOLERANCE: break
-        
-        beta = (r_norm_new**2) / (r_norm_old**2)
-        p = (H_T @ r) + beta * p
-        r_norm_old = r_norm_new
-        
-    return f, i + 1
-
-def execute_cgnr(H, g_norm):
-    H_T = H.T
-    
-    f = np.zeros(H.shape[1], dtype=np.float32)
-    r = g_norm.astype(np.float32) - H @ np.zeros(H.shape[1], dtype=np.float32)
-    z = H_T @ r
-    p = z.copy()
-    z_norm_sq_old = np.linalg.norm(z)**2
-
-    for i in range(MAX_ITERATIONS):
-        w = H @ p
-        w_norm_sq = np.linalg.norm(w)**2
-        if w_norm_sq < 1e-15: break
-
-        alpha = z_norm_sq_old / w_norm_sq
-        f = f + alpha * p
-        r = r - alpha * w
-        
-        z_next = H_T @ r
-        z_norm_sq_new = np.linalg.norm(z_next)**2
-        
-        if z_norm_sq_new < 1e-15: break
-
-        beta = z_norm_sq_new / z_norm_sq_old
-        p = z_next + beta * p
-        z_norm_sq_old = z_norm_sq_new
-
-    return f, i + 1
-
 def _execute_alg_for_measurement(H_raw, g_raw, alg_name):
     start_measure = time.time()
     
@@ -134,10 +87,7 @@ def _execute_alg_for_measurement(H_raw, g_raw, alg_name):
     g_std = np.std(g_raw)
     g_norm = (g_raw - g_mean) / g_std if g_std > 1e-12 else g_raw - g_mean
     
-    if alg_name == 'cgne':
-        execute_cgne(H_norm, g_norm) 
-    else:
-        execute_cgnr(H_norm, g_norm)
+    solve_relative(get_solver(alg_name), H_norm, g_norm)
 
     cpu_measure = psutil.cpu_percent(interval=None)
     mem_measure = psutil.virtual_memory().percent
@@ -191,6 +141,38 @@ def client_wait(file_name, alg):
     waiting_clients -= 1
     return resource_id
 
+def normalize_model(H_raw, stats=None):
+    # Média/desvio vêm do manifesto de ingestão quando disponíveis, evitando duas passadas sobre H.
+    H_mean, H_std = stats if stats else (np.mean(H_raw), np.std(H_raw))
+    
+    if H_std > 1e-12:
+        H_norm = (H_raw - H_mean) / H_std
+    else:
+        H_norm = H_raw - H_mean
+    return H_norm, H_std
+
+def reconstruct_signal(H_norm, H_std, g_raw, solver, options=None):
+    g_mean = np.mean(g_raw)
+    g_std = np.std(g_raw)
+    g_norm = (g_raw - g_mean) / g_std if g_std > 1e-12 else g_raw - g_mean
+
+    max_iter, rel_tol = options if options else solver_options()
+    f, its, history = solve_relative(solver, H_norm, g_norm, max_iter, rel_tol)
+
+    if H_std > 1e-12:
+        f = f * (g_std / H_std)
+        
+    f_clipped = np.clip(f, 0, None)
+    f_max = f_clipped.max()
+    f_norm_img = (f_clipped / f_max * 255.0) if f_max > 1e-9 else f_clipped
+    
+    lado = int(np.sqrt(len(f_norm_img)))
+    img_arr = f_norm_img.reshape((lado, lado), order='F').astype(np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(img_arr).save(buf, format='PNG')
+    buf.seek(0)
+    return buf, its, history
+
 @app.post("/interpretedServer/reconstruct")
 def reconstruct():
     global active_clients, waiting_clients
@@ -200,6 +182,13 @@ def reconstruct():
     ganho_header = request.headers.get('X-Ganho')
 
     if not model_name or not algorithm: return jsonify({'error': 'Headers erro'}), 400
+    solver = get_solver(algorithm)
+    if solver is None:
+        return jsonify({'error': f"Algoritmo desconhecido: {algorithm}", 'disponiveis': sorted(SOLVERS)}), 400
+    try:
+        options = solver_options(request.headers.get('X-Max-Iter'), request.headers.get('X-Tol-Rel'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     waiting_clients += 1
     resource_id = client_wait(model_name, algorithm)
@@ -215,35 +204,8 @@ def reconstruct():
         raw_bytes = request.get_data()
         g_raw = np.frombuffer(raw_bytes, dtype=np.float32)
 
-        H_mean = np.mean(H_raw)
-        H_std = np.std(H_raw)
-        
-        if H_std > 1e-12:
-            H_norm = (H_raw - H_mean) / H_std
-        else:
-            H_norm = H_raw - H_mean
-            
-        g_mean = np.mean(g_raw)
-        g_std = np.std(g_raw)
-        g_norm = (g_raw - g_mean) / g_std if g_std > 1e-12 else g_raw - g_mean
-
-        if algorithm.lower() == 'cgne':
-            f, its = execute_cgne(H_norm, g_norm)
-        else:
-            f, its = execute_cgnr(H_norm, g_norm)
-
-        if H_std > 1e-12:
-            f = f * (g_std / H_std)
-            
-        f_clipped = np.clip(f, 0, None)
-        f_max = f_clipped.max()
-        f_norm_img = (f_clipped / f_max * 255.0) if f_max > 1e-9 else f_clipped
-        
-        lado = int(np.sqrt(len(f_norm_img)))
-        img_arr = f_norm_img.reshape((lado, lado), order='F').astype(np.uint8)
-        buf = io.BytesIO()
-        Image.fromarray(img_arr).save(buf, format='PNG')
-        buf.seek(0)
+        H_norm, H_std = normalize_model(H_raw, MODEL_STATS.get(model_name))
+        buf, its, history = reconstruct_signal(H_norm, H_std, g_raw, solver, options)
         
         end_time = time.time()
         
@@ -251,6 +213,7 @@ def reconstruct():
         resp.headers['X-Tempo'] = f"{end_time - start_time:.4f}"
         resp.headers['X-Algoritmo'] = algorithm
         resp.headers['X-Iteracoes'] = str(its)
+        resp.headers['X-Residuo'] = f"{history[-1]:.6g}"
         resp.headers['X-Cpu'] = str(psutil.cpu_percent(interval=None))
         resp.headers['X-Mem'] = str(psutil.virtual_memory().percent)
         if ganho_header: resp.headers['X-Ganho'] = ganho_header
@@ -264,8 +227,201 @@ def reconstruct():
         semaphore_files[resource_id].release()
         active_clients -= 1
 
+# Lote: corpo = uint32 big-endian com o tamanho do manifesto JSON, o manifesto
+# ([{"id", "modelo", "alg", "ganho", "tamanho", "max_iter"?, "tol_rel"?}, ...]) e os sinais float32 concatenados na mesma ordem.
+# Resposta: para cada item, na ordem em que termina, uma linha JSON com "bytes": N seguida de N bytes de PNG.
+def parse_bulk_body(raw_bytes):
+    (manifest_len,) = struct.unpack_from('>I', raw_bytes, 0)
+    offset = 4 + manifest_len
+    manifest = json.loads(raw_bytes[4:offset].decode('utf-8'))
+    if not isinstance(manifest, list) or not all(isinstance(entry, dict) for entry in manifest):
+        raise ValueError("Manifesto deve ser uma lista de objetos")
+
+    items = []
+    for idx, entry in enumerate(manifest):
+        entry.setdefault('id', idx)
+        tamanho = entry.get('tamanho')
+        if not isinstance(tamanho, int) or isinstance(tamanho, bool) or tamanho <= 0:
+            raise ValueError(f"Item {entry['id']}: 'tamanho' deve ser um inteiro positivo")
+        n_bytes = tamanho * 4
+        if offset + n_bytes > len(raw_bytes):
+            raise ValueError(f"Sinal do item {entry['id']} truncado")
+        entry['g_raw'] = np.frombuffer(raw_bytes, dtype=np.float32, count=tamanho, offset=offset)
+        offset += n_bytes
+        items.append(entry)
+
+    if offset != len(raw_bytes):
+        raise ValueError(f"{len(raw_bytes) - offset} bytes sobrando após o último item")
+    return items
+
+def run_bulk_group(model_name, items, results):
+    global active_clients, waiting_clients
+
+    waiting_clients += 1
+    resource_id = client_wait(model_name, items[0]['alg'])
+    active_clients += 1
+
+    try:
+        H_norm, H_std = normalize_model(RAW_MODEL_CACHE[model_name], MODEL_STATS.get(model_name))
+        for item in items:
+            start_time = time.time()
+            try:
+                buf, its, history = reconstruct_signal(H_norm, H_std, item['g_raw'], get_solver(item['alg']), item['options'])
+                results.put(({
+                    'id': item['id'],
+                    'status': 200,
+                    'modelo': model_name,
+                    'algoritmo': item['alg'],
+                    'ganho': item.get('ganho'),
+                    'iteracoes': its,
+                    'residuo': history[-1],
+                    'tempo': round(time.time() - start_time, 4),
+                    'cpu': psutil.cpu_percent(interval=None),
+                    'mem': psutil.virtual_memory().percent,
+                }, buf.getvalue()))
+            except Exception as e:
+                results.put(({'id': item['id'], 'status': 500, 'error': str(e)}, b''))
+    except Exception as e:
+        print(f"Erro lote {model_name}: {e}")
+        for item in items:
+            results.put(({'id': item['id'], 'status': 500, 'error': str(e)}, b''))
+    finally:
+        semaphore_files[resource_id].release()
+        active_clients -= 1
+
+@app.post("/interpretedServer/reconstructBatch")
+def reconstruct_batch():
+    try:
+        items = parse_bulk_body(request.get_data())
+    except Exception as e:
+        return jsonify({'error': f"Corpo de lote inválido: {e}"}), 400
+
+    results = queue.Queue()
+    groups = {}
+    for item in items:
+        if get_solver(item.get('alg')) is None:
+            results.put(({'id': item['id'], 'status': 400, 'error': f"Algoritmo desconhecido: {item.get('alg')}"}, b''))
+        elif not isinstance(item.get('modelo'), str):
+            results.put(({'id': item['id'], 'status': 400, 'error': "'modelo' deve ser uma string"}, b''))
+        elif item['modelo'] not in RAW_MODEL_CACHE:
+            results.put(({'id': item['id'], 'status': 404, 'error': 'Modelo off'}, b''))
+        elif item['tamanho'] != RAW_MODEL_CACHE[item['modelo']].shape[0]:
+            expected = RAW_MODEL_CACHE[item['modelo']].shape[0]
+            results.put(({'id': item['id'], 'status': 400,
+                          'error': f"Sinal deve ter {expected} valores float32, recebido {item['tamanho']}"}, b''))
+        else:
+            try:
+                item['options'] = solver_options(item.get('max_iter'), item.get('tol_rel'))
+            except ValueError as e:
+                results.put(({'id': item['id'], 'status': 400, 'error': str(e)}, b''))
+                continue
+            groups.setdefault(item['modelo'], []).append(item)
+
+    # Itens do mesmo modelo compartilham uma única normalização de H e uma única vaga no escalonador.
+    for model_name, group in groups.items():
+        threading.Thread(target=run_bulk_group, args=(model_name, group, results), daemon=True).start()
+
+    def generate():
+        for _ in range(len(items)):
+            meta, png = results.get()
+            meta['bytes'] = len(png)
+            yield json.dumps(meta).encode('utf-8') + b'\n' + png
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+def process_job(params, signal_bytes):
+    global active_clients, waiting_clients
+
+    model_name = params['modelo']
+    algorithm = params['alg']
+
+    waiting_clients += 1
+    resource_id = client_wait(model_name, algorithm)
+    active_clients += 1
+
+    start_time = time.time()
+    try:
+        H_norm, H_std = normalize_model(RAW_MODEL_CACHE[model_name], MODEL_STATS.get(model_name))
+        g_raw = np.frombuffer(signal_bytes, dtype=np.float32)
+        buf, its, history = reconstruct_signal(H_norm, H_std, g_raw, get_solver(algorithm),
+                                                 solver_options(params.get('max_iter'), params.get('tol_rel')))
+        meta = {
+            'X-Tempo': f"{time.time() - start_time:.4f}",
+            'X-Algoritmo': algorithm,
+            'X-Iteracoes': str(its),
+            'X-Residuo': f"{history[-1]:.6g}",
+            'X-Cpu': str(psutil.cpu_percent(interval=None)),
+            'X-Mem': str(psutil.virtual_memory().percent),
+        }
+        if params.get('ganho'): meta['X-Ganho'] = params['ganho']
+        return buf.getvalue(), meta
+    finally:
+        semaphore_files[resource_id].release()
+        active_clients -= 1
+
+def job_status(job):
+    body = {'job_id': job['id'], 'status': job['status']}
+    if job['error']: body['error'] = job['error']
+    return body
+
+@app.post("/interpretedServer/jobs")
+def create_job():
+    model_name = request.headers.get('X-Modelo')
+    algorithm = request.headers.get('X-Alg') or request.headers.get('X-Algoritmo')
+
+    if not model_name or not algorithm: return jsonify({'error': 'Headers erro'}), 400
+    if get_solver(algorithm) is None:
+        return jsonify({'error': f"Algoritmo desconhecido: {algorithm}", 'disponiveis': sorted(SOLVERS)}), 400
+    if model_name not in RAW_MODEL_CACHE: return jsonify({'error': 'Modelo off'}), 404
+
+    signal_bytes = request.get_data()
+    expected = RAW_MODEL_CACHE[model_name].shape[0]
+    if len(signal_bytes) % 4 != 0 or len(signal_bytes) // 4 != expected:
+        return jsonify({'error': f"Sinal deve ter {expected} valores float32 ({expected * 4} bytes), recebido {len(signal_bytes)} bytes"}), 400
+    try:
+        max_iter, rel_tol = solver_options(request.headers.get('X-Max-Iter'), request.headers.get('X-Tol-Rel'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    params = {'modelo': model_name, 'alg': algorithm, 'ganho': request.headers.get('X-Ganho'),
+              'max_iter': max_iter, 'tol_rel': rel_tol}
+    try:
+        job = submit_job(params, signal_bytes)
+    except sqlite3.Error as e:
+        print(f"Erro ao persistir job: {e}")
+        return jsonify({'error': 'Falha ao persistir job'}), 503
+    if job is None: return jsonify({'error': 'Fila de jobs cheia'}), 503
+
+    resp = jsonify(job_status(job))
+    resp.status_code = 202
+    resp.headers['Location'] = f"/interpretedServer/jobs/{job['id']}"
+    return resp
+
+@app.get("/interpretedServer/jobs/<job_id>")
+def fetch_job(job_id):
+    wait = request.args.get('wait', 0, type=float)
+    if wait is None or not math.isfinite(wait): return jsonify({'error': "'wait' deve ser um número finito"}), 400
+    job = get_job(job_id, wait)
+    if job is None: return jsonify({'error': 'Job não encontrado'}), 404
+
+    if job['status'] != 'done':
+        return jsonify(job_status(job))
+
+    resp = make_response(send_file(io.BytesIO(job['result']), mimetype='image/png'))
+    for key, value in job['meta'].items():
+        resp.headers[key] = value
+    return resp
+
+@app.delete("/interpretedServer/jobs/<job_id>")
+def delete_job(job_id):
+    job = cancel_job(job_id)
+    if job is None: return jsonify({'error': 'Job não encontrado'}), 404
+    if job['status'] != 'cancelled': return jsonify(job_status(job)), 409
+    return jsonify(job_status(job))
+
 if __name__ == '__main__':
     load_raw_models_ram()
     determine_cpu_mem()
+    init_jobs(process_job)
     print("Servidor Pronto. (Cálculos em tempo real)")
     app.run(host='0.0.0.0', port=5000, threaded=True)
\ No newline at end of file
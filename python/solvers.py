@@ -0,0 +1,242 @@
+import math
+import numpy as np
+from typing import Callable, Dict, List, Tuple
+
+MAX_ITERATIONS = 10
+ERROR_TOLERANCE = 1e-4
+TIKHONOV_FACTOR = 0.10
+
+# Critério de parada usado pelo servidor: ||g - H f|| <= RELATIVE_TOLERANCE * ||g||,
+# com teto de SERVER_MAX_ITERATIONS (ajustável por requisição até MAX_ITERATIONS_LIMIT).
+# O teto padrão é o mesmo de antes (10): a tolerância relativa só pode encerrar mais cedo.
+RELATIVE_TOLERANCE = 0.1
+SERVER_MAX_ITERATIONS = MAX_ITERATIONS
+MAX_ITERATIONS_LIMIT = 500
+
+# Em float32 as recorrências de CG perdem ortogonalidade depois de convergir e o resíduo volta a crescer.
+# Para quando o resíduo não melhora (relativamente) por STAGNATION_WINDOW iterações e devolve o melhor iterado.
+STAGNATION_TOLERANCE = 1e-4
+STAGNATION_WINDOW = 3
+
+# Todo algoritmo recebe (H, g, max_iter, tol) e devolve (f, iteracoes, historico_residuo),
+# onde historico_residuo[k] = ||g - H f_k|| (k = 0 é a estimativa inicial f = 0) e f é o
+# melhor iterado encontrado (o histórico termina nele).
+SolverFn = Callable[..., Tuple[np.ndarray, int, List[float]]]
+
+SOLVERS: Dict[str, SolverFn] = {}
+
+def register_solver(name):
+    def decorator(fn):
+        SOLVERS[name.lower()] = fn
+        return fn
+    return decorator
+
+def get_solver(name):
+    return SOLVERS.get(name.lower()) if isinstance(name, str) else None
+
+def solve_relative(solver, H, g_norm, max_iter=SERVER_MAX_ITERATIONS, rel_tol=RELATIVE_TOLERANCE):
+    tol = rel_tol * float(np.linalg.norm(g_norm))
+    return solver(H, g_norm, max_iter=max_iter, tol=tol)
+
+def _parse_int(value, name):
+    # Aceita só inteiros de verdade ou strings inteiras: nada de bool nem truncamento de float.
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lstrip('+-').isdigit():
+        return int(value)
+    raise ValueError(f"{name} deve ser um inteiro")
+
+def _parse_float(value, name):
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{name} deve ser um número")
+    try:
+        value = float(value)
+    except (ValueError, OverflowError):
+        raise ValueError(f"{name} deve ser um número")
+    if not math.isfinite(value):
+        raise ValueError(f"{name} deve ser finito")
+    return value
+
+def solver_options(max_iter=None, rel_tol=None):
+    # Converte/valida os parâmetros de parada vindos de headers ou do manifesto de lote.
+    max_iter = SERVER_MAX_ITERATIONS if max_iter in (None, '') else _parse_int(max_iter, 'max_iter')
+    rel_tol = RELATIVE_TOLERANCE if rel_tol in (None, '') else _parse_float(rel_tol, 'tol_rel')
+    if not 1 <= max_iter <= MAX_ITERATIONS_LIMIT:
+        raise ValueError(f"max_iter deve estar entre 1 e {MAX_ITERATIONS_LIMIT}")
+    if not 0.0 <= rel_tol < 1.0:
+        raise ValueError("tol_rel deve estar em [0, 1)")
+    return max_iter, rel_tol
+
+class _BestIterate:
+    def __init__(self, f, r_norm):
+        self.f = f
+        self.history = [float(r_norm)]
+        self.best = 0
+
+    def update(self, f, r_norm):
+        # Devolve True quando o solver deve parar: resíduo não finito, crescente ou estagnado.
+        r_norm = float(r_norm)
+        if not np.isfinite(r_norm): return True
+        self.history.append(r_norm)
+        k = len(self.history) - 1
+        if r_norm < self.history[self.best] * (1.0 - STAGNATION_TOLERANCE):
+            self.best = k
+            self.f = f
+            return False
+        return k - self.best >= STAGNATION_WINDOW
+
+    def result(self):
+        return self.f, self.best, self.history[:self.best + 1]
+
+def _breakdown(x):
+    return not np.isfinite(x) or x < 1e-15
+
+@register_solver('cgne')
+def execute_cgne(H, g_norm, max_iter=MAX_ITERATIONS, tol=ERROR_TOLERANCE):
+    H_T = H.T
+
+    f = np.zeros(H.shape[1], dtype=np.float32)
+    r = g_norm.astype(np.float32)
+    p = H_T @ r
+    r_norm_old = np.linalg.norm(r)
+    best = _BestIterate(f, r_norm_old)
+
+    for i in range(max_iter):
+        p_norm_sq = np.dot(p, p)
+        if _breakdown(p_norm_sq): break
+
+        alpha = (r_norm_old**2) / p_norm_sq
+        f = f + alpha * p
+        r = r - alpha * (H @ p)
+        r_norm_new = np.linalg.norm(r)
+
+        if best.update(f, r_norm_new) or r_norm_new < tol: break
+
+        beta = (r_norm_new**2) / (r_norm_old**2)
+        p = (H_T @ r) + beta * p
+        r_norm_old = r_norm_new
+
+    return best.result()
+
+@register_solver('cgnr')
+def execute_cgnr(H, g_norm, max_iter=MAX_ITERATIONS, tol=ERROR_TOLERANCE):
+    return _cgnr(H, g_norm, np.ones(H.shape[1], dtype=np.float32), max_iter, tol)
+
+@register_solver('cgnr_jacobi')
+def execute_cgnr_jacobi(H, g_norm, max_iter=MAX_ITERATIONS, tol=ERROR_TOLERANCE):
+    # Pré-condicionador de Jacobi sobre H^T H: escala cada coluna pela sua norma.
+    col_norms = np.linalg.norm(H, axis=0).astype(np.float32)
+    col_norms[col_norms < 1e-12] = 1.0
+    return _cgnr(H, g_norm, col_norms, max_iter, tol)
+
+def _cgnr(H, g_norm, d, max_iter, tol):
+    # CGNR sobre o sistema escalado (H D^-1) y = g, com f = D^-1 y; D = I é o CGNR puro.
+    H_T = H.T
+    d_inv = (1.0 / d).astype(np.float32)
+
+    y = np.zeros(H.shape[1], dtype=np.float32)
+    r = g_norm.astype(np.float32).copy()
+    z = d_inv * (H_T @ r)
+    p = z.copy()
+    z_norm_sq_old = np.dot(z, z)
+    best = _BestIterate(y, np.linalg.norm(r))
+
+    for i in range(max_iter):
+        w = H @ (d_inv * p)
+        w_norm_sq = np.dot(w, w)
+        if _breakdown(w_norm_sq): break
+
+        alpha = z_norm_sq_old / w_norm_sq
+        y = y + alpha * p
+        r = r - alpha * w
+        r_norm = np.linalg.norm(r)
+        if best.update(y, r_norm) or r_norm < tol: break
+
+        z_next = d_inv * (H_T @ r)
+        z_norm_sq_new = np.dot(z_next, z_next)
+
+        if _breakdown(z_norm_sq_new): break
+
+        beta = z_norm_sq_new / z_norm_sq_old
+        p = z_next + beta * p
+        z_norm_sq_old = z_norm_sq_new
+
+    y, its, history = best.result()
+    return d_inv * y, its, history
+
+@register_solver('lsqr')
+def execute_lsqr(H, g_norm, max_iter=MAX_ITERATIONS, tol=ERROR_TOLERANCE):
+    # LSQR (Paige & Saunders): bidiagonalização de Golub-Kahan; phi_bar = ||g - H f||.
+    H_T = H.T
+
+    f = np.zeros(H.shape[1], dtype=np.float32)
+    u = g_norm.astype(np.float32).copy()
+    beta = np.linalg.norm(u)
+    best = _BestIterate(f, beta)
+    if beta < 1e-15: return best.result()
+    u = u / beta
+    v = H_T @ u
+    alpha = np.linalg.norm(v)
+    if alpha < 1e-15: return best.result()
+    v = v / alpha
+    w = v.copy()
+    phi_bar = beta
+    rho_bar = alpha
+
+    for i in range(max_iter):
+        u = H @ v - alpha * u
+        beta = np.linalg.norm(u)
+        if beta > 1e-15: u = u / beta
+        v = H_T @ u - beta * v
+        alpha = np.linalg.norm(v)
+        if alpha > 1e-15: v = v / alpha
+
+        rho = np.hypot(rho_bar, beta)
+        c = rho_bar / rho
+        s = beta / rho
+        theta = s * alpha
+        rho_bar = -c * alpha
+        phi = c * phi_bar
+        phi_bar = s * phi_bar
+
+        f = f + (phi / rho) * w
+        w = v - (theta / rho) * w
+
+        if best.update(f, phi_bar) or phi_bar < tol or alpha < 1e-15: break
+
+    return best.result()
+
+@register_solver('tikhonov')
+def execute_tikhonov(H, g_norm, max_iter=MAX_ITERATIONS, tol=ERROR_TOLERANCE):
+    # CGNR regularizado: (H^T H + lambda I) f = H^T g, com lambda = 0.10 * max|H^T g|.
+    H_T = H.T
+
+    g = g_norm.astype(np.float32)
+    f = np.zeros(H.shape[1], dtype=np.float32)
+    r = g.copy()
+    s = H_T @ r
+    lam = np.float32(TIKHONOV_FACTOR * np.max(np.abs(s)))
+    p = s.copy()
+    s_norm_sq_old = np.dot(s, s)
+    best = _BestIterate(f, np.linalg.norm(r))
+
+    for i in range(max_iter):
+        q = H @ p
+        denom = np.dot(q, q) + lam * np.dot(p, p)
+        if _breakdown(denom): break
+
+        alpha = s_norm_sq_old / denom
+        f = f + alpha * p
+        r = r - alpha * q
+        r_norm = np.linalg.norm(r)
+        if best.update(f, r_norm) or r_norm < tol: break
+
+        s = H_T @ r - lam * f
+        s_norm_sq_new = np.dot(s, s)
+        if _breakdown(s_norm_sq_new): break
+
+        beta = s_norm_sq_new / s_norm_sq_old
+        p = s + beta * p
+        s_norm_sq_old = s_norm_sq_new
+
+    return best.result()
@@ -1,3 +1,6 @@
+import sys
+import math
+import argparse
 import random
 
 MODELS = ['H_60x60.csv', 'H_30x30.csv']
@@ -6,6 +9,18 @@ SIGNAL30 = ['sinal_1_30x30.csv', 'sinal_2_30x30.csv', 'sinal_3_30x30.csv']
 ALGORITHM = ['CGNE', 'CGNR'] 
 GAIN_OPTIONS = [True, False]
 
+# Parâmetros padrão do gerador de carga realista (gerar_carga)
+ZIPF_MODELS = 1.0
+ZIPF_SIGNALS = 1.2
+ALGORITHM_MIX = {'CGNE': 0.3, 'CGNR': 0.7}
+GAIN_PROBABILITY = 0.5
+ARRIVAL_RATE = 2.0        # requisições por segundo (média)
+BURST_RATE = 20.0         # taxa durante uma rajada
+BURST_MEAN_DURATION = 5.0
+BURST_MEAN_GAP = 30.0
+DIURNAL_PERIOD = 300.0    # segundos de trace equivalentes a um "dia"
+DIURNAL_AMPLITUDE = 0.8
+
 def perform_sorteio(num_sinais, output_filename='requisicoes.txt'):
     final_output_filename = f"sorteio_{output_filename}"
     
@@ -29,5 +44,108 @@ def perform_sorteio(num_sinais, output_filename='requisicoes.txt'):
     print(f"Sorteio concluído. Arquivo salvo em: {final_output_filename}")
     return final_output_filename
 
+def zipf_weights(n, s):
+    return [1.0 / (k + 1) ** s for k in range(n)]
+
+def arrival_times(rng, num_sinais, process='poisson', rate=ARRIVAL_RATE,
+                  burst_rate=BURST_RATE, burst_mean_duration=BURST_MEAN_DURATION, burst_mean_gap=BURST_MEAN_GAP,
+                  diurnal_period=DIURNAL_PERIOD, diurnal_amplitude=DIURNAL_AMPLITUDE):
+    t = 0.0
+    times = []
+
+    if process == 'poisson':
+        while len(times) < num_sinais:
+            t += rng.expovariate(rate)
+            times.append(t)
+
+    elif process == 'burst':
+        # On/off: rajadas com taxa burst_rate intercaladas com períodos na taxa base.
+        in_burst = False
+        phase_end = rng.expovariate(1.0 / burst_mean_gap)
+        while len(times) < num_sinais:
+            current_rate = burst_rate if in_burst else rate
+            next_t = t + rng.expovariate(current_rate)
+            if next_t > phase_end:
+                t = phase_end
+                in_burst = not in_burst
+                phase_end = t + rng.expovariate(1.0 / (burst_mean_duration if in_burst else burst_mean_gap))
+                continue
+            t = next_t
+            times.append(t)
+
+    elif process == 'diurnal':
+        # Poisson não homogêneo por thinning: taxa(t) = rate * (1 + A * sin(2*pi*t / período)).
+        peak = rate * (1.0 + diurnal_amplitude)
+        while len(times) < num_sinais:
+            t += rng.expovariate(peak)
+            current_rate = rate * (1.0 + diurnal_amplitude * math.sin(2 * math.pi * t / diurnal_period))
+            if rng.random() * peak <= current_rate:
+                times.append(t)
+
+    else:
+        raise ValueError(f"Processo de chegada desconhecido: {process}")
+
+    return times
+
+def gerar_carga(num_sinais, output_filename='trace.txt', process='poisson', rate=ARRIVAL_RATE, seed=None,
+                zipf_models=ZIPF_MODELS, zipf_signals=ZIPF_SIGNALS, algorithm_mix=ALGORITHM_MIX,
+                gain_probability=GAIN_PROBABILITY, burst_rate=BURST_RATE, burst_mean_duration=BURST_MEAN_DURATION,
+                burst_mean_gap=BURST_MEAN_GAP, diurnal_period=DIURNAL_PERIOD, diurnal_amplitude=DIURNAL_AMPLITUDE):
+    rng = random.Random(seed)
+    final_output_filename = f"carga_{output_filename}"
+
+    print(f"Gerando trace: {final_output_filename} com {num_sinais} entradas (chegada={process}, taxa={rate}/s, seed={seed})...")
+
+    model_weights = zipf_weights(len(MODELS), zipf_models)
+    signal_weights = {
+        'H_60x60.csv': zipf_weights(len(SIGNAL60), zipf_signals),
+        'H_30x30.csv': zipf_weights(len(SIGNAL30), zipf_signals),
+    }
+    algorithms = list(algorithm_mix)
+    algorithm_weights = [algorithm_mix[a] for a in algorithms]
+
+    with open(final_output_filename, 'w') as f:
+        f.write("# timestamp,model,signal,algorithm,has_gain\n")
+        arrivals = arrival_times(rng, num_sinais, process, rate, burst_rate, burst_mean_duration, burst_mean_gap,
+                                 diurnal_period, diurnal_amplitude)
+        for t in arrivals:
+            model = rng.choices(MODELS, model_weights)[0]
+            signals = SIGNAL60 if model == 'H_60x60.csv' else SIGNAL30
+            signal = rng.choices(signals, signal_weights[model])[0]
+            algorithm = rng.choices(algorithms, algorithm_weights)[0]
+            has_gain = rng.random() < gain_probability
+
+            f.write(f"{t:.4f},{model},{signal},{algorithm},{has_gain}\n")
+
+    print(f"Trace concluído. Arquivo salvo em: {final_output_filename}")
+    return final_output_filename
+
+def main_carga(argv):
+    parser = argparse.ArgumentParser(prog="sorteio.py carga", description="Gera um trace de carga com timestamps.")
+    parser.add_argument('num_sinais', nargs='?', type=int, default=1000)
+    parser.add_argument('processo', nargs='?', choices=['poisson', 'burst', 'diurnal'], default='poisson')
+    parser.add_argument('taxa', nargs='?', type=float, default=ARRIVAL_RATE)
+    parser.add_argument('seed', nargs='?', type=int, default=None)
+    parser.add_argument('--saida', default='trace.txt')
+    parser.add_argument('--zipf-modelos', type=float, default=ZIPF_MODELS)
+    parser.add_argument('--zipf-sinais', type=float, default=ZIPF_SIGNALS)
+    parser.add_argument('--prob-ganho', type=float, default=GAIN_PROBABILITY)
+    parser.add_argument('--taxa-rajada', type=float, default=BURST_RATE)
+    parser.add_argument('--duracao-rajada', type=float, default=BURST_MEAN_DURATION)
+    parser.add_argument('--intervalo-rajada', type=float, default=BURST_MEAN_GAP)
+    parser.add_argument('--periodo-diurno', type=float, default=DIURNAL_PERIOD)
+    parser.add_argument('--amplitude-diurna', type=float, default=DIURNAL_AMPLITUDE)
+    args = parser.parse_args(argv)
+
+    gerar_carga(args.num_sinais, args.saida, process=args.processo, rate=args.taxa, seed=args.seed,
+                zipf_models=args.zipf_modelos, zipf_signals=args.zipf_sinais, gain_probability=args.prob_ganho,
+                burst_rate=args.taxa_rajada, burst_mean_duration=args.duracao_rajada,
+                burst_mean_gap=args.intervalo_rajada, diurnal_period=args.periodo_diurno,
+                diurnal_amplitude=args.amplitude_diurna)
+
 if __name__ == "__main__":
-    perform_sorteio(num_sinais=30)
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == 'carga':
+        # python sorteio.py carga [num_sinais] [poisson|burst|diurnal] [taxa] [seed] [--taxa-rajada ...]
+        main_carga(sys.argv[2:])
+    else:
+        perform_sorteio(num_sinais=30)
\ No newline at end of file
@@ -0,0 +1,53 @@
+import json
+import numpy as np
+import pytest
+from ingestao import ingest_model, is_cache_fresh, cache_paths, read_manifest
+
+EXPECTED = np.array([[1, 2, 3], [4, 5, 6], [7.5, -8, 9e-3]], dtype=np.float32)
+
+@pytest.mark.parametrize("content", [
+    b"1,2,3\n4,5,6\n7.5,-8,9e-3\n",
+    b"1,2,3\r\n4,5,6\r\n7.5,-8,9e-3\r\n",
+    b"1,2,3\n\n4,5,6\n7.5,-8,9e-3\n\n",
+    b"\n1,2,3\r\n\r\n4,5,6\n7.5,-8,9e-3",
+])
+def test_ingest_model_formats(tmp_path, content):
+    csv_file = tmp_path / "H_teste.csv"
+    csv_file.write_bytes(content)
+    cache_dir = str(tmp_path / "cache")
+
+    # Blocos pequenos para forçar várias faixas e fronteiras no meio do arquivo.
+    manifest = ingest_model(str(csv_file), cache_dir, workers=2, chunk_bytes=4)
+
+    npy_path, manifest_path = cache_paths(str(csv_file), cache_dir)
+    H = np.load(npy_path)
+    assert H.dtype == np.float32
+    np.testing.assert_array_equal(H, EXPECTED)
+    assert manifest['shape'] == [3, 3]
+    assert manifest['mean'] == pytest.approx(float(EXPECTED.astype(np.float64).mean()))
+    assert manifest['std'] == pytest.approx(float(EXPECTED.astype(np.float64).std()))
+    assert read_manifest(manifest_path) == manifest
+    assert is_cache_fresh(str(csv_file), cache_dir, verify_checksum=True)
+
+def test_cache_stale_when_source_changes(tmp_path):
+    csv_file = tmp_path / "H_teste.csv"
+    csv_file.write_bytes(b"1,2\n3,4\n")
+    cache_dir = str(tmp_path / "cache")
+    ingest_model(str(csv_file), cache_dir, workers=1)
+
+    csv_file.write_bytes(b"1,2\n3,4\n5,6\n")
+    assert not is_cache_fresh(str(csv_file), cache_dir)
+
+@pytest.mark.parametrize("missing", ['shape', 'dtype', 'source_size', 'source_mtime', 'sha256', 'mean'])
+def test_incomplete_manifest_is_stale(tmp_path, missing):
+    csv_file = tmp_path / "H_teste.csv"
+    csv_file.write_bytes(b"1,2\n3,4\n")
+    cache_dir = str(tmp_path / "cache")
+    manifest = ingest_model(str(csv_file), cache_dir, workers=1)
+
+    del manifest[missing]
+    _, manifest_path = cache_paths(str(csv_file), cache_dir)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f)
+
+    assert not is_cache_fresh(str(csv_file), cache_dir, verify_checksum=True)
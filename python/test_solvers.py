@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from solvers import SOLVERS, TIKHONOV_FACTOR, get_solver, solver_options
+
+def _system(m=300, n=40, seed=0):
+    rng = np.random.default_rng(seed)
+    H = (rng.standard_normal((m, n)) + 3.0 * np.eye(m, n)).astype(np.float32)
+    f_true = rng.standard_normal(n).astype(np.float32)
+    return H, f_true, H @ f_true
+
+@pytest.mark.parametrize("name", ['cgne', 'cgnr', 'cgnr_jacobi', 'lsqr'])
+def test_solver_recovers_known_solution(name):
+    H, f_true, g = _system()
+    f, its, history = SOLVERS[name](H, g, max_iter=200, tol=1e-4 * np.linalg.norm(g))
+
+    np.testing.assert_allclose(f, f_true, atol=1e-3)
+    assert its == len(history) - 1
+    assert history[-1] == pytest.approx(float(np.linalg.norm(g - H @ f)), rel=1e-2, abs=1e-3)
+
+def test_lsqr_matches_least_squares_on_inconsistent_system():
+    H, _, g = _system()
+    g = g + np.random.default_rng(1).standard_normal(g.size).astype(np.float32)
+    f, _, _ = SOLVERS['lsqr'](H, g, max_iter=200, tol=0)
+
+    # Em sistema inconsistente o resíduo estabiliza antes da solução; a parada por estagnação aceita isso.
+    f_ls = np.linalg.lstsq(H.astype(np.float64), g.astype(np.float64), rcond=None)[0]
+    np.testing.assert_allclose(f, f_ls, atol=1e-2)
+
+def test_tikhonov_matches_closed_form():
+    H, _, g = _system()
+    f, _, _ = SOLVERS['tikhonov'](H, g, max_iter=200, tol=0)
+
+    H64, g64 = H.astype(np.float64), g.astype(np.float64)
+    lam = TIKHONOV_FACTOR * np.max(np.abs(H64.T @ g64))
+    f_ref = np.linalg.solve(H64.T @ H64 + lam * np.eye(H.shape[1]), H64.T @ g64)
+    np.testing.assert_allclose(f, f_ref, atol=1e-2)
+
+@pytest.mark.parametrize("name", sorted(SOLVERS))
+def test_solver_does_not_diverge_with_unreachable_tolerance(name):
+    rng = np.random.default_rng(0)
+    H = rng.random((2000, 400)).astype(np.float32) * rng.random(400).astype(np.float32) * 5
+    H = (H - H.mean()) / H.std()
+    g = H @ rng.random(400).astype(np.float32) + 0.01 * rng.standard_normal(2000).astype(np.float32)
+
+    _, _, short = SOLVERS[name](H, g, max_iter=30, tol=0)
+    f, _, history = SOLVERS[name](H, g, max_iter=500, tol=0)
+
+    assert np.all(np.isfinite(f))
+    assert history[-1] == min(history)
+    assert history[-1] <= short[-1] * (1 + 1e-6)
+    assert float(np.linalg.norm(g - H @ f)) == pytest.approx(history[-1], rel=1e-2)
+
+def test_get_solver_and_options():
+    assert get_solver('CGNR') is SOLVERS['cgnr']
+    assert get_solver(1) is None
+    with pytest.raises(ValueError):
+        solver_options(0, None)
+
+@pytest.mark.parametrize("max_iter", [True, 2.5, 1e400, "2.5", "abc", [3]])
+def test_solver_options_rejects_non_integer_max_iter(max_iter):
+    with pytest.raises(ValueError):
+        solver_options(max_iter, None)
+
+@pytest.mark.parametrize("rel_tol", [True, float('nan'), float('inf'), "1e400", [0.1]])
+def test_solver_options_rejects_invalid_rel_tol(rel_tol):
+    with pytest.raises(ValueError):
+        solver_options(None, rel_tol)
+
+def test_solver_options_accepts_integer_strings():
+    assert solver_options("25", "0.05") == (25, 0.05)
+    assert solver_options(25, 0) == (25, 0.0)